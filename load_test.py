@@ -0,0 +1,435 @@
+# ============================================================
+# Load-test harness for streamlit_portfolio_app.py
+# Starts a real `streamlit run` server against a synthetic dataset and drives it with
+# N concurrent headless websocket sessions. Reports p50/p95/p99 rerun latency per
+# page, server throughput, the server's peak RSS and st.cache_data hit rates.
+#
+# Usage:
+#   python load_test.py --sessions 8 --iterations 20 --rows 50000
+#   python load_test.py --rows 250000 --max-p95-ms 1500   # regression gate (exit 1 on breach)
+#
+# Notes:
+# - Each session speaks Streamlit's websocket protocol like a browser tab: it sends
+#   rerun requests with its widget states and waits for script_finished. Sessions
+#   run side by side, so scripts compete for the server's CPU and share its caches.
+# - With --think-ms 0 every session reruns back to back and keeps the server busy, so
+#   reruns/s is the saturated throughput of one server process (capacity number).
+# - The client runs on the same machine; it only parses protobuf messages, but run it
+#   on a host sized like the target server.
+# - Reruns that raised or timed out are counted separately and left out of the
+#   percentiles.
+# ============================================================
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+APP_PATH = Path(__file__).resolve().parent / "streamlit_portfolio_app.py"
+
+PAGES = [
+    "Introduction",
+    "Sales Overview",
+    "Sales Manager",
+    "Head of Sales",
+    "Customer Segmentation",
+    "Insights & Recommendations",
+]
+
+FILTER_LABELS = ["Select Year(s)", "Select Month(s)", "Select City / Region"]
+NAV_LABEL = "Navigation"
+K_LABEL = "Choose number of clusters (k)"
+
+MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+          "August", "September", "October", "November", "December"]
+
+# ---------- Synthetic dataset ----------
+def make_synthetic_df(rows, seed=42):
+    """Build a data-pharmacy.csv look-alike with the original column names."""
+    rng = np.random.default_rng(seed)
+    n_customers = max(50, rows // 300)
+    n_cities = max(10, min(250, rows // 1000))
+    n_products = 240
+    n_reps = 20
+
+    customers = np.array([f"Customer {i:05d}" for i in range(n_customers)])
+    cities = np.array([f"City {i:03d}" for i in range(n_cities)])
+    products = np.array([f"Product {i:03d}" for i in range(n_products)])
+    classes = np.array(["Mood Stabilizers", "Antibiotics", "Antiseptics", "Analgesics", "Antipiretics", "Antimalarial"])
+    reps = np.array([f"Rep {i:02d}" for i in range(n_reps)])
+    managers = np.array(["Britanny Bold", "Tracy Banks", "Alisha Cordwell", "Jimmy Grey"])
+    teams = np.array(["Delta", "Bravo", "Alfa", "Charlie"])
+    channel = rng.choice(["Hospital", "Pharmacy"], rows)
+    sub_channel = np.where(channel == "Hospital",
+                           rng.choice(["Private", "Government", "Institution"], rows),
+                           "Retail")
+
+    city_idx = rng.integers(0, n_cities, rows)
+    product_idx = rng.integers(0, n_products, rows)
+    rep_idx = rng.integers(0, n_reps, rows)
+    quantity = rng.integers(1, 50, rows)
+    price = rng.integers(10, 800, n_products)[product_idx]
+
+    return pd.DataFrame({
+        "Distributor": rng.choice(["Gottlieb-Cruickshank", "Bashirian-Kassulke", "Hayes-Kuhn"], rows),
+        "Customer Name": customers[rng.zipf(1.3, rows) % n_customers],
+        "City": cities[city_idx],
+        "Country": rng.choice(["Poland", "Germany"], rows, p=[0.8, 0.2]),
+        "Latitude": 50 + city_idx / n_cities * 4,
+        "Longitude": 15 + city_idx / n_cities * 8,
+        "Channel": channel,
+        "Sub-channel": sub_channel,
+        "Product Name": products[product_idx],
+        "Product Class": classes[product_idx % len(classes)],
+        "Quantity": quantity,
+        "Price": price,
+        "Sales": quantity * price,
+        "Month": rng.choice(MONTHS, rows),
+        "Year": rng.integers(2017, 2021, rows),
+        "Name of Sales Rep": reps[rep_idx],
+        "Manager": managers[rep_idx % len(managers)],
+        "Sales Team": teams[rep_idx % len(teams)],
+    })
+
+# ---------- Server process ----------
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unavailable."""
+    if resource is not None:
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD),
+                        ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t),
+                        ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t),
+                        ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        get_info = ctypes.windll.psapi.GetProcessMemoryInfo
+        get_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if get_info(handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize / 1024 / 1024
+    return None
+
+def serve(port, stats_path):
+    """Run the app under `streamlit run` with st.cache_data hit/miss counters.
+
+    Cache stats and peak RSS are written to stats_path every half second so the
+    harness can read them without stopping the server.
+    """
+    from streamlit.runtime.caching.cache_data_api import DataCache
+    from streamlit.web import cli
+
+    # A hit is a successful read; a miss is a computed value being written back (reads
+    # are retried under the compute lock, so failed reads would double-count misses).
+    cache_stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+    lock = threading.Lock()
+    original_read, original_write = DataCache.read_result, DataCache.write_result
+
+    def counting_read(self, value_key):
+        result = original_read(self, value_key)
+        with lock:
+            cache_stats[self.display_name]["hits"] += 1
+        return result
+
+    def counting_write(self, value_key, value, messages):
+        with lock:
+            cache_stats[self.display_name]["misses"] += 1
+        return original_write(self, value_key, value, messages)
+
+    DataCache.read_result, DataCache.write_result = counting_read, counting_write
+
+    baseline_rss = peak_rss_mb()
+
+    def dump_stats():
+        while True:
+            with lock:
+                stats = {"cache": dict(cache_stats), "baseline_rss_mb": baseline_rss, "peak_rss_mb": peak_rss_mb()}
+            tmp = Path(f"{stats_path}.tmp")
+            tmp.write_text(json.dumps(stats))
+            tmp.replace(stats_path)
+            time.sleep(0.5)
+
+    threading.Thread(target=dump_stats, daemon=True).start()
+
+    sys.argv = [
+        "streamlit", "run", str(APP_PATH),
+        "--server.headless", "true",
+        "--server.address", "127.0.0.1",
+        "--server.port", str(port),
+        "--server.fileWatcherType", "none",
+        "--browser.gatherUsageStats", "false",
+        "--logger.level", "error",
+    ]
+    cli.main(prog_name="streamlit")
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(workdir, startup_timeout=60):
+    """Start the instrumented server in a child process; return (process, port, stats_path, log_path)."""
+    port = _free_port()
+    stats_path = Path(workdir) / "server_stats.json"
+    log_path = Path(workdir) / "server.log"
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "--serve", str(port), str(stats_path)],
+            cwd=workdir, stdout=log, stderr=subprocess.STDOUT,
+        )
+
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            break
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as r:
+                if r.status == 200 and stats_path.exists():
+                    return proc, port, stats_path, log_path
+        except OSError:
+            pass
+        time.sleep(0.3)
+
+    proc.kill()
+    sys.exit(f"Streamlit server did not start:\n{_tail(log_path)}")
+
+def _tail(path, lines=25):
+    return "\n".join(Path(path).read_text(errors="replace").splitlines()[-lines:])
+
+# ---------- Websocket sessions ----------
+class Session:
+    """A headless browser tab: tracks widget ids/options and sends their states on rerun."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}  # label -> widget proto from the last run
+        self.states = {}   # label -> WidgetState the user has set
+
+    async def rerun(self):
+        """Request a rerun; return True if the script raised an exception."""
+        msg = BackMsg()
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        await self.ws.send(msg.SerializeToString())
+
+        widgets, raised = {}, False
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.ws.recv())
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type in ("radio", "multiselect", "slider", "selectbox"):
+                    widget = getattr(element, element_type)
+                    widgets[widget.label] = widget
+                elif element_type == "exception":
+                    raised = True
+            elif kind == "script_finished":
+                # like a browser, forget the state of widgets that are no longer shown
+                self.widgets = widgets
+                self.states = {label: s for label, s in self.states.items() if label in widgets}
+                return raised
+
+    def set_value(self, label, **value):
+        widget = self.widgets.get(label)
+        if widget is None:
+            return False
+        state = WidgetState(id=widget.id)
+        for field, v in value.items():
+            if field == "string_value":
+                state.string_value = v
+            else:
+                getattr(state, field).data.extend(v)
+        self.states[label] = state
+        return True
+
+async def _timed_rerun(session, page, samples, timeout):
+    t0 = time.perf_counter()
+    try:
+        raised = await asyncio.wait_for(session.rerun(), timeout)
+    except asyncio.TimeoutError:
+        samples.append({"page": page, "rerun_ms": (time.perf_counter() - t0) * 1000,
+                        "error": False, "timeout": True})
+        return False
+    except (websockets.ConnectionClosed, OSError):
+        samples.append({"page": page, "rerun_ms": (time.perf_counter() - t0) * 1000,
+                        "error": True, "timeout": False})
+        return False
+    samples.append({"page": page, "rerun_ms": (time.perf_counter() - t0) * 1000,
+                    "error": raised, "timeout": False})
+    return True
+
+async def run_session(url, session_id, iterations, timeout, think_ms, seed, samples):
+    """Navigate pages and toggle filters / k like a manager would; append latency samples.
+
+    A rerun that times out or drops the connection ends the session, since the
+    server may still be streaming that run's output.
+    """
+    rng = random.Random(seed + session_id)
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        session = Session(ws)
+        page = "Introduction"
+        if not await _timed_rerun(session, page, samples, timeout):
+            return
+
+        for _ in range(iterations):
+            if think_ms:
+                await asyncio.sleep(rng.uniform(0, 2 * think_ms) / 1000)
+
+            action = rng.choice(["page", "page", "filter", "k"])
+            if action == "page":
+                page = rng.choice(PAGES)
+                session.set_value(NAV_LABEL, string_value=page)
+            elif action == "filter":
+                label = rng.choice(FILTER_LABELS)
+                options = list(session.widgets[label].options)
+                session.set_value(label, string_array_value=rng.sample(options, rng.randint(1, len(options))))
+            else:
+                if page != "Customer Segmentation":
+                    page = "Customer Segmentation"
+                    session.set_value(NAV_LABEL, string_value=page)
+                    if not await _timed_rerun(session, page, samples, timeout):
+                        return
+                if not session.set_value(K_LABEL, double_array_value=[rng.randint(2, 8)]):
+                    continue
+            if not await _timed_rerun(session, page, samples, timeout):
+                return
+
+async def run_sessions(url, args):
+    samples = []
+    await asyncio.gather(*(
+        run_session(url, i, args.iterations, args.timeout, args.think_ms, args.seed, samples)
+        for i in range(args.sessions)
+    ))
+    return samples
+
+# ---------- Reporting ----------
+def summarize(samples):
+    df = pd.DataFrame(samples, columns=["page", "rerun_ms", "error", "timeout"])
+    # a rerun that raised stops early and a timed-out one never finished, so only
+    # successful reruns feed the percentiles
+    ok = df[~(df["error"] | df["timeout"])].groupby("page")["rerun_ms"]
+    by_page = df.groupby("page")
+    summary = pd.DataFrame({
+        "reruns": by_page.size(),
+        "errors": by_page["error"].sum(),
+        "timeouts": by_page["timeout"].sum(),
+        "p50_ms": ok.quantile(0.50),
+        "p95_ms": ok.quantile(0.95),
+        "p99_ms": ok.quantile(0.99),
+    })
+    return summary.reindex([p for p in PAGES if p in summary.index]).round(1)
+
+def cache_summary(cache_stats):
+    rows = []
+    for name, s in sorted(cache_stats.items()):
+        total = s["hits"] + s["misses"]
+        rows.append({"function": name, "hits": s["hits"], "misses": s["misses"],
+                     "hit_rate": f"{s['hits'] / total:.1%}" if total else "n/a"})
+    return pd.DataFrame(rows, columns=["function", "hits", "misses", "hit_rate"])
+
+def _fmt_mb(mb):
+    return f"{mb:,.0f} MB" if mb is not None else "n/a"
+
+# ---------- Main ----------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the portfolio app.")
+    parser.add_argument("--sessions", type=int, default=8, help="number of concurrent sessions")
+    parser.add_argument("--iterations", type=int, default=20, help="interactions per session")
+    parser.add_argument("--rows", type=int, default=50_000, help="rows in the synthetic dataset")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--think-ms", type=float, default=0, help="mean think time between interactions")
+    parser.add_argument("--timeout", type=float, default=120, help="per-rerun timeout in seconds")
+    parser.add_argument("--max-p95-ms", type=float, default=None,
+                        help="fail (exit 1) if any page p95 rerun latency exceeds this")
+    args = parser.parse_args(argv)
+    for name in ("sessions", "iterations", "rows"):
+        if getattr(args, name) < 1:
+            parser.error(f"--{name} must be at least 1")
+    if args.timeout <= 0:
+        parser.error("--timeout must be positive")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # the app looks for ./data/data-pharmacy.csv relative to the working directory
+        (Path(workdir) / "data").mkdir()
+        make_synthetic_df(args.rows, seed=args.seed).to_csv(Path(workdir) / "data" / "data-pharmacy.csv", index=False)
+
+        proc, port, stats_path, log_path = start_server(workdir)
+        try:
+            started = time.perf_counter()
+            samples = asyncio.run(run_sessions(f"ws://127.0.0.1:{port}/_stcore/stream", args))
+            elapsed = time.perf_counter() - started
+            time.sleep(1)  # let the server write its final stats
+            stats = json.loads(stats_path.read_text())
+            server_log = _tail(log_path)
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    summary = summarize(samples)
+    completed = sum(not s["timeout"] for s in samples)
+    print(f"Sessions: {args.sessions} | Interactions/session: {args.iterations} | Rows: {args.rows:,}")
+    if args.think_ms:
+        print(f"Reruns: {len(samples):,} in {elapsed:.1f}s (throughput n/a with --think-ms; rerun with 0 to saturate)")
+    else:
+        print(f"Reruns: {len(samples):,} in {elapsed:.1f}s ({completed / elapsed:.1f} completed reruns/s, saturated server throughput)")
+    print(f"Server peak RSS: {_fmt_mb(stats['peak_rss_mb'])} (at startup: {_fmt_mb(stats['baseline_rss_mb'])})")
+    print()
+    print(summary.to_string())
+    print()
+    print(cache_summary(stats["cache"]).to_string(index=False))
+
+    failed = summary[(summary["errors"] > 0) | (summary["timeouts"] > 0)]
+    if not failed.empty:
+        print(f"\nFAIL: reruns raised or timed out on: {', '.join(failed.index)}", file=sys.stderr)
+        print(f"--- server log (tail) ---\n{server_log}", file=sys.stderr)
+        return 1
+    if args.max_p95_ms is not None:
+        breached = summary[summary["p95_ms"] > args.max_p95_ms]
+        if not breached.empty:
+            print(f"\nFAIL: p95 above {args.max_p95_ms:.0f} ms on: {', '.join(breached.index)}", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--serve":
+        serve(int(sys.argv[2]), sys.argv[3])
+    else:
+        sys.exit(main())
@@ -384,7 +384,7 @@ elif page == T("Sales Overview", "Gambaran Penjualan"):
     col1, col2 = st.columns([2,1])
     with col1:
         if 'invoice_date' in df_filtered.columns and df_filtered['invoice_date'].notna().any():
-            monthly = df_filtered.set_index('invoice_date').resample('M')['sales_value'].sum().reset_index()
+            monthly = df_filtered.set_index('invoice_date').resample('ME')['sales_value'].sum().reset_index()
             st.subheader(T("Monthly Revenue", "Pendapatan Bulanan"))
             st.plotly_chart(px.line(monthly, x='invoice_date', y='sales_value', title=T("Monthly Revenue Trend", "Tren Pendapatan Bulanan")), use_container_width=True)
     with col2: